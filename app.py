@@ -5,7 +5,6 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from PyQt6.QtGui import QIcon, QColor, QPalette
 from PyQt6.QtWidgets import QApplication, QStyleFactory
 from config import STYLE
-from main_window import MainWindow
 
 def dark_palette() -> QPalette:
     pal = QPalette()
@@ -26,6 +25,7 @@ def main() -> int:
     app.setPalette(dark_palette())
     font = app.font(); font.setPointSize(10); app.setFont(font)
     app.setStyleSheet(STYLE)
+    from main_window import MainWindow  # Deferred: pulls in the editor, jedi and psutil after QApplication is up
     try: app.setWindowIcon(QIcon("icon.ico"))
     except: pass
     window = MainWindow()
@@ -1,7 +1,7 @@
 """Configuration, data models, and shared styles."""
 from __future__ import annotations
-import json, re, sys
-from dataclasses import dataclass, asdict
+import json, os, re, sys
+from dataclasses import dataclass, fields
 from pathlib import Path
 
 __version__ = "1.0.2"
@@ -15,7 +15,7 @@ CONFIG_FILE = APP_DIR / "bots.json"
 LOGS_DIR = APP_DIR / "logs"
 
 # Tuning
-MAX_LOG_LINES = 50_000
+MAX_LOG_LINES = 50_000  # Blocks kept by a live log view and lines a LogBuffer keeps to refill one
 FLUSH_INTERVAL_MS = 100
 STATS_INTERVAL_MS = 1000
 HISTORY_CHUNK = 5000
@@ -23,11 +23,12 @@ KILL_TIMEOUT_MS = 500
 MAX_FLUSH_CHARS = 50_000
 
 # ANSI
-ANSI_RE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
-strip_ansi = lambda t: ANSI_RE.sub('', t)
-normalize = lambda t: t.replace("\x00", "").replace("\r\n", "\n").replace("\r", "\n")
+ANSI_RE = re.compile(r'\x1b\[[0-?]*[ -/]*[@-~]')
+strip_ansi = lambda t: ANSI_RE.sub('', t) if '\x1b' in t else t
+_NORMALIZE = str.maketrans({"\x00": None, "\r": "\n"})
+normalize = lambda t: t.replace("\r\n", "\n").translate(_NORMALIZE) if "\r" in t or "\x00" in t else t
 
-@dataclass
+@dataclass(slots=True)
 class Bot:
     name: str
     entry: str = ""
@@ -36,15 +37,18 @@ class Bot:
     custom_cmd: bool = False
     python_path: str = ""
 
+_BOT_FIELDS = tuple(f.name for f in fields(Bot))
+
 def load_config() -> dict[str, Bot]:
     if not CONFIG_FILE.exists(): return {}
     try:
-        data = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
+        with CONFIG_FILE.open("rb") as f: data = json.load(f)
         return {n: Bot(**{**{"custom_cmd": False, "python_path": ""}, **c}) for n, c in data.items()}
     except: return {}
 
 def save_config(bots: dict[str, Bot]) -> None:
-    try: CONFIG_FILE.write_text(json.dumps({n: asdict(b) for n, b in bots.items()}, indent=2), encoding="utf-8")
+    tmp = CONFIG_FILE.with_suffix(".json.tmp")
+    try: tmp.write_bytes(json.dumps({n: {f: getattr(b, f) for f in _BOT_FIELDS} for n, b in bots.items()}, separators=(",", ":")).encode("utf-8")); os.replace(tmp, CONFIG_FILE)
     except: pass
 
 # Shared styles
@@ -58,6 +62,16 @@ QScrollBar:horizontal { background: #1a1a1a; height: 12px; }
 QScrollBar::handle:horizontal { background: #404040; min-width: 20px; border-radius: 4px; margin: 2px; }
 QScrollBar::handle:horizontal:hover { background: #505050; }
 QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal { width: 0; }
+AnsiConsole { background: #121212; color: #ddd; border: 1px solid #333; border-radius: 2px; padding: 2px; }
+QSplitter#mainSplitter::handle:horizontal:hover { background: qlineargradient(x1:0,y1:0,x2:1,y2:0,stop:0.45 transparent,stop:0.5 #3a3a3a,stop:0.55 transparent); }
+QComboBox#botCombo { padding: 4px 8px; border: 1px solid #333; border-radius: 2px; background: #1a1a1a; }
+QComboBox#botCombo:hover { border-color: #444; }
+QComboBox#botCombo::drop-down { border: none; width: 20px; }
+QComboBox#botCombo QAbstractItemView { background: #1a1a1a; border: 1px solid #333; selection-background-color: #4688d8; }
+QTabWidget#logTabs::pane { border: 1px solid #2a2a2a; border-top: none; border-radius: 0 0 2px 2px; }
+QTabWidget#logTabs QTabBar::tab { background: #1a1a1a; border: 1px solid #2a2a2a; border-bottom: none; padding: 6px 16px; margin-right: 2px; border-radius: 2px 2px 0 0; }
+QTabWidget#logTabs QTabBar::tab:selected { background: #252525; border-color: #252525; }
+QTabWidget#logTabs QTabBar::tab:hover:!selected { background: #202020; }
 """
 BTN = """QPushButton { padding: 4px 10px; border: 1px solid #333; border-radius: 2px; background: #252525; }
 QPushButton:hover { background: #303030; border-color: #444; }
@@ -1,13 +1,14 @@
 """ANSI Console - Terminal emulator with color support (256-color, true color, bold, inverse)."""
 from __future__ import annotations
-import os
-from dataclasses import dataclass, field
-from typing import Optional
+import os, re
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Callable, Optional
 from PyQt6.QtGui import QColor, QFont, QTextCharFormat, QTextCursor
 from PyQt6.QtWidgets import QTextEdit
 from config import normalize
 
-@dataclass
+@dataclass(slots=True)
 class AnsiState:
     bold: bool = False
     inverse: bool = False
@@ -15,16 +16,39 @@ class AnsiState:
     bg: Optional[QColor] = None
     tail: str = ""
 
+_CSI_RE = re.compile(r"\x1b\[([^@-~]*)([@-~])")  # Params run until the first final byte (0x40-0x7E)
+
+@lru_cache(maxsize=1024)
+def _sgr_params(params: str) -> tuple[int, ...]:
+    if params.isdecimal(): return (int(params),)  # Single code ("0", "31") needs no split
+    return tuple(int(p) for p in params.split(";") if p.isdecimal()) or (0,)
+
+@lru_cache(maxsize=4096)
+def _rgb(r: int, g: int, b: int) -> QColor: return QColor(r, g, b)
+
+def _sgr_table(fg0: QColor, bg0: QColor, colors: tuple[QColor, ...]) -> dict[int, Callable[[AnsiState], None]]:
+    """Build the SGR code -> state mutator dispatch table (extended 38/48 colors are handled inline)."""
+    def reset(s: AnsiState) -> None: s.bold = s.inverse = False; s.fg, s.bg = fg0, bg0
+    def attr(name: str, value) -> Callable[[AnsiState], None]: return lambda s: setattr(s, name, value)
+    table = {0: reset, 1: attr("bold", True), 22: attr("bold", False), 7: attr("inverse", True), 27: attr("inverse", False),
+             39: attr("fg", fg0), 49: attr("bg", bg0)}
+    for i in range(8): table[30+i] = attr("fg", colors[i]); table[40+i] = attr("bg", colors[i]); table[90+i] = attr("fg", colors[i+8])
+    return table
+
 class AnsiConsole(QTextEdit):
-    PALETTE = ((0,0,0),(205,0,0),(0,205,0),(205,205,0),(0,0,238),(205,0,205),(0,205,205),(229,229,229),
-               (127,127,127),(255,0,0),(0,255,0),(255,255,0),(92,92,255),(255,0,255),(0,255,255),(255,255,255))
+    PALETTE = tuple(QColor(*rgb) for rgb in ((0,0,0),(205,0,0),(0,205,0),(205,205,0),(0,0,238),(205,0,205),(0,205,205),(229,229,229),
+               (127,127,127),(255,0,0),(0,255,0),(255,255,0),(92,92,255),(255,0,255),(0,255,255),(255,255,255)))
     DEFAULT_FG, DEFAULT_BG = QColor(221,221,221), QColor(18,18,18)
+    _COLOR_CACHE = (PALETTE
+                    + tuple(QColor((n//36)*51, ((n//6)%6)*51, (n%6)*51) for n in range(216))
+                    + tuple(QColor(g, g, g) for g in range(8, 248, 10)))
+    _SGR_TABLE = _sgr_table(DEFAULT_FG, DEFAULT_BG, _COLOR_CACHE)
+    _FMT_CACHE: dict[tuple[bool, int, int], QTextCharFormat] = {}
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setReadOnly(True)
         self.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
-        self.setStyleSheet("QTextEdit { background: #121212; color: #ddd; border: 1px solid #333; border-radius: 2px; padding: 2px; }")
         font = QFont("Consolas" if os.name == "nt" else "Monospace", 10)
         font.setStyleHint(QFont.StyleHint.TypeWriter)
         self.setFont(font)
@@ -32,54 +56,52 @@ class AnsiConsole(QTextEdit):
         self._fmt = self._build_format()
 
     def _build_format(self) -> QTextCharFormat:
-        fmt = QTextCharFormat()
-        fmt.setFontWeight(QFont.Weight.Bold if self._state.bold else QFont.Weight.Normal)
-        fg, bg = self._state.fg or self.DEFAULT_FG, self._state.bg or self.DEFAULT_BG
-        if self._state.inverse: fg, bg = bg, fg
-        fmt.setForeground(fg); fmt.setBackground(bg)
+        st = self._state
+        fg, bg = st.fg or self.DEFAULT_FG, st.bg or self.DEFAULT_BG
+        if st.inverse: fg, bg = bg, fg
+        key = (st.bold, fg.rgba(), bg.rgba())
+        if (fmt := self._FMT_CACHE.get(key)) is None:
+            if len(self._FMT_CACHE) >= 4096: self._FMT_CACHE.clear()  # Bound true-color gradients
+            fmt = QTextCharFormat()
+            fmt.setFontWeight(QFont.Weight.Bold if st.bold else QFont.Weight.Normal)
+            fmt.setForeground(fg); fmt.setBackground(bg)
+            self._FMT_CACHE[key] = fmt
         return fmt
 
-    def _color(self, n: int) -> QColor:
-        if n < 16: return QColor(*self.PALETTE[n])
-        if n < 232: n -= 16; return QColor((n//36)*51, ((n//6)%6)*51, (n%6)*51)
-        g = 8 + (n-232)*10; return QColor(g, g, g)
+    def _color(self, n: int) -> Optional[QColor]: return self._COLOR_CACHE[n] if n < 256 else None
 
     def _parse_sgr(self, params: str) -> None:
-        nums = [int(p) for p in params.split(";") if p.isdigit()] or [0]
-        i = 0
-        while i < len(nums):
+        nums, st, table = _sgr_params(params), self._state, self._SGR_TABLE
+        i, n = 0, len(nums)
+        while i < n:
             c = nums[i]
-            if c == 0: self._state.bold = self._state.inverse = False; self._state.fg, self._state.bg = self.DEFAULT_FG, self.DEFAULT_BG
-            elif c == 1: self._state.bold = True
-            elif c == 22: self._state.bold = False
-            elif c == 7: self._state.inverse = True
-            elif c == 27: self._state.inverse = False
-            elif 30 <= c <= 37: self._state.fg = self._color(c-30)
-            elif c == 39: self._state.fg = self.DEFAULT_FG
-            elif 40 <= c <= 47: self._state.bg = self._color(c-40)
-            elif c == 49: self._state.bg = self.DEFAULT_BG
-            elif 90 <= c <= 97: self._state.fg = self._color(c-82)
+            if (fn := table.get(c)): fn(st)
             elif c in (38, 48):
-                is_fg = c == 38
-                if i+2 < len(nums) and nums[i+1] == 5:
-                    col = self._color(nums[i+2]); (setattr(self._state, 'fg', col) if is_fg else setattr(self._state, 'bg', col)); i += 2
-                elif i+4 < len(nums) and nums[i+1] == 2:
-                    col = QColor(nums[i+2], nums[i+3], nums[i+4]); (setattr(self._state, 'fg', col) if is_fg else setattr(self._state, 'bg', col)); i += 4
+                attr = "fg" if c == 38 else "bg"
+                if i+2 < n and nums[i+1] == 5: setattr(st, attr, self._color(nums[i+2])); i += 2
+                elif i+4 < n and nums[i+1] == 2: setattr(st, attr, _rgb(nums[i+2], nums[i+3], nums[i+4])); i += 4
             i += 1
         self._fmt = self._build_format()
 
     def _write(self, text: str, cursor: QTextCursor) -> None:
         if '\x1b[' not in text: cursor.insertText(text, self._fmt); return
-        i, length = 0, len(text)
-        while i < length:
-            esc = text.find("\x1b[", i)
-            if esc < 0: cursor.insertText(text[i:], self._fmt); break
-            if esc > i: cursor.insertText(text[i:esc], self._fmt)
-            j = esc + 2
-            while j < length and not ("@" <= text[j] <= "~"): j += 1
-            if j >= length: self._state.tail = text[esc:]; break
-            if text[j] == "m": self._parse_sgr(text[esc+2:j])
-            i = j + 1
+        runs: list[str] = []; fmt = self._fmt
+        def emit(chunk: str) -> None:  # Coalesce adjacent runs sharing a (cached) format into one insertText
+            nonlocal fmt
+            if self._fmt is not fmt:
+                if runs: cursor.insertText("".join(runs), fmt); runs.clear()
+                fmt = self._fmt
+            runs.append(chunk)
+        i = 0
+        for m in _CSI_RE.finditer(text):
+            if m.start() > i: emit(text[i:m.start()])
+            if m.group(2) == "m": self._parse_sgr(m.group(1))
+            i = m.end()
+        esc = text.find("\x1b[", i)  # Unterminated sequence can only sit at the end
+        if esc >= 0: self._state.tail = text[esc:]
+        else: esc = len(text)
+        if esc > i: emit(text[i:esc])
+        if runs: cursor.insertText("".join(runs), fmt)
 
     def append_text(self, text: str) -> None:
         if not text: return
@@ -93,7 +115,7 @@ class AnsiConsole(QTextEdit):
     def prepend_text(self, text: str) -> None:
         if not text: return
         text = normalize(text)
-        saved = AnsiState(self._state.bold, self._state.inverse, self._state.fg, self._state.bg, self._state.tail)
+        saved = replace(self._state)
         self._reset()
         cursor = self.textCursor(); cursor.movePosition(QTextCursor.MoveOperation.Start)
         cursor.beginEditBlock()
@@ -1,9 +1,10 @@
 """Python Code Editor - Syntax highlighting, line numbers, and completion."""
 from __future__ import annotations
-import builtins, keyword, os, re, sys
+import builtins, keyword, os, re, sys, threading
+from functools import lru_cache
 from pathlib import Path
 from typing import Callable, Optional
-from PyQt6.QtCore import QEvent, QObject, QRect, QRunnable, QSize, Qt, QSaveFile, QStringListModel, QThreadPool, QTimer, pyqtSignal
+from PyQt6.QtCore import QEvent, QObject, QPoint, QRect, QRunnable, QSize, Qt, QSaveFile, QStringListModel, QThreadPool, QTimer, pyqtSignal
 from PyQt6.QtGui import QAction, QColor, QCloseEvent, QFont, QKeySequence, QPainter, QTextCharFormat, QTextCursor, QTextFormat, QSyntaxHighlighter
 from PyQt6.QtWidgets import QCompleter, QFileDialog, QHBoxLayout, QLabel, QLineEdit, QMessageBox, QPushButton, QPlainTextEdit, QTextEdit, QVBoxLayout, QWidget, QStyle
 from config import BTN
@@ -17,65 +18,87 @@ def _fmt(color: str, bold: bool = False, italic: bool = False) -> QTextCharForma
     if italic: f.setFontItalic(True)
     return f
 
+_LN_BG, _LN_SEP, _LN_TEXT, _HL_LINE = QColor("#1a1a1a"), QColor("#2b2b2b"), QColor("#888"), QColor(70, 136, 216, 35)
+
+_KW = frozenset(keyword.kwlist)
+_IMPORT_KW = frozenset({"import", "from", "as"})
+_BUILTINS = frozenset(n for n in dir(builtins) if not n.startswith("_"))
+_SELFISH = frozenset({"self", "global", "nonlocal"})
+
 class PythonHighlighter(QSyntaxHighlighter):
-    _re_ident = re.compile(r"\b[A-Za-z_]\w*\b")
-    _re_number = re.compile(r"\b(?:0x[0-9A-Fa-f]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\b")
-    _re_decorator = re.compile(r"(^|\s)(@\w+(?:\.\w+)*)")
-    _re_def = re.compile(r"\bdef\s+([A-Za-z_]\w*)")
-    _re_class = re.compile(r"\bclass\s+([A-Za-z_]\w*)")
-    _re_str = re.compile(r"""(?P<prefix>\b[fFrRuU]{0,2})?(?P<q>['"])(?P<body>(?:\\.|(?!\2).)*)(?P=q)""")
+    CACHE_MAX, LAZY_CHUNK = 20_000, 500
+    # One alternation scanned left to right; earlier branches win at the same position
+    _re_token = re.compile(r"""
+        (?P<tri>(?:\b[fFrRuU]{1,2})?(?:'''|\"\"\"))
+      | (?P<str>(?:\b[fFrRuU]{1,2})?(?:'[^'\\]*+(?:\\.[^'\\]*+)*+'|"[^"\\]*+(?:\\.[^"\\]*+)*+"))
+      | (?P<cmt>\#.*)
+      | (?P<deco>(?:^|(?<=\s))@\w+(?:\.\w+)*)
+      | (?P<def>\b(?P<defkw>def|class)\s+(?P<name>[A-Za-z_]\w*))
+      | (?P<num>\b(?:0x[0-9A-Fa-f]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\b)
+      | (?P<ident>\b[A-Za-z_]\w*\b)""", re.VERBOSE)
+    f_kw = _fmt("#C792EA", bold=True); f_builtin = _fmt("#82AAFF"); f_num = _fmt("#F78C6C")
+    f_deco = _fmt("#FFCB6B"); f_class = _fmt("#FFCB6B", bold=True); f_def = _fmt("#82AAFF", bold=True)
+    f_import = _fmt("#89DDFF", bold=True); f_self = _fmt("#F07178", bold=True)
+    f_const = _fmt("#FF5370", bold=True); f_str = _fmt("#C3E88D"); f_comment = _fmt("#7a8699", italic=True)
+    # Lowest precedence first so later groups overwrite: import > keyword > builtin > self
+    _ident_fmt = {w: f for ws, f in [(_SELFISH, f_self), (_BUILTINS, f_builtin), (_KW, f_kw), (_IMPORT_KW, f_import)] for w in ws}
 
     def __init__(self, doc):
         super().__init__(doc)
-        self.f_kw = _fmt("#C792EA", bold=True); self.f_builtin = _fmt("#82AAFF"); self.f_num = _fmt("#F78C6C")
-        self.f_deco = _fmt("#FFCB6B"); self.f_class = _fmt("#FFCB6B", bold=True); self.f_def = _fmt("#82AAFF", bold=True)
-        self.f_import = _fmt("#89DDFF", bold=True); self.f_self = _fmt("#F07178", bold=True)
-        self.f_const = _fmt("#FF5370", bold=True); self.f_str = _fmt("#C3E88D"); self.f_comment = _fmt("#7a8699", italic=True)
-        self._kw = set(keyword.kwlist); self._import_kw = {"import", "from", "as"}
-        self._builtins = {n for n in dir(builtins) if not n.startswith("_")}; self._selfish = {"self", "global", "nonlocal"}
+        self._cache: dict[tuple[str, int], tuple[tuple[tuple[int, int, QTextCharFormat], ...], int]] = {}
+        self._limit = sys.maxsize  # Blocks past this are left for idle ticks (see defer)
+        self._idle = QTimer(self); self._idle.setSingleShot(True); self._idle.timeout.connect(self._advance)
 
-    def _in_spans(self, i: int, spans: list) -> bool: return any(a <= i < b for a, b in spans)
+    def defer(self) -> None:
+        """Highlight only the first LAZY_CHUNK blocks of the next load; idle ticks cover the rest."""
+        self._limit = self.LAZY_CHUNK - 1; self._idle.start(0)
+
+    def _advance(self) -> None:
+        doc, start = self.document(), self._limit + 1
+        self._limit += self.LAZY_CHUNK
+        block = doc.findBlockByNumber(start) if doc else None
+        if block is None or not block.isValid(): self._limit = sys.maxsize; return
+        self.rehighlightBlock(block); self._idle.start(0)  # Cascades until the first block past the new limit
 
     def highlightBlock(self, text: str) -> None:
-        self.setCurrentBlockState(0); spans = []
-        def mark(a, b):
-            if a < b: spans.append((a, b)); self.setFormat(a, b-a, self.f_str)
-        prev, i = self.previousBlockState(), 0
+        if self._limit != sys.maxsize and self.currentBlock().blockNumber() > self._limit:
+            self.setCurrentBlockState(-1); return  # Unchanged state stops Qt's cascade here
+        key = (text, self.previousBlockState())
+        if (hit := self._cache.get(key)) is None:
+            if len(self._cache) >= self.CACHE_MAX: self._cache.clear()
+            hit = self._cache[key] = self._scan(*key)
+        spans, state = hit
+        for s, n, fmt in spans: self.setFormat(s, n, fmt)
+        self.setCurrentBlockState(state)
+
+    def _scan(self, text: str, prev: int) -> tuple[tuple[tuple[int, int, QTextCharFormat], ...], int]:
+        """Tokenise one block; pure in (text, previous state) so results can be memoised."""
+        out: list[tuple[int, int, QTextCharFormat]] = []; emit = out.append
+        i, n = 0, len(text)
+        if not text or text.isspace(): return (((0, n, self.f_str),), prev) if prev in (1, 2) else ((), 0)
         if prev in (1, 2):
-            delim = "'''" if prev == 1 else '"""'; end = text.find(delim)
-            if end == -1: mark(0, len(text)); self.setCurrentBlockState(prev); return
-            mark(0, end+3); i = end+3
-        while i < len(text):
-            s1, s2 = text.find("'''", i), text.find('"""', i)
-            if s1 == -1 and s2 == -1: break
-            if s2 == -1 or (s1 != -1 and s1 < s2): s, delim, state = s1, "'''", 1
-            else: s, delim, state = s2, '"""', 2
-            e = text.find(delim, s+3)
-            if e == -1: mark(s, len(text)); self.setCurrentBlockState(state); break
-            mark(s, e+3); i = e+3
-        for m in self._re_str.finditer(text):
-            if not self._in_spans(m.start(), spans): mark(m.start(), m.end())
-        h, scan_to = text.find("#"), len(text)
-        if h != -1 and not self._in_spans(h, spans): self.setFormat(h, len(text)-h, self.f_comment); scan_to = h
-        head = text[:scan_to]
-        for m in self._re_decorator.finditer(head):
-            pos = m.start(2)
-            if not self._in_spans(pos, spans): self.setFormat(pos, len(m.group(2)), self.f_deco)
-        for rx, fmt, g in [(self._re_def, self.f_def, 1), (self._re_class, self.f_class, 1)]:
-            for m in rx.finditer(head):
-                pos = m.start(g)
-                if not self._in_spans(pos, spans): self.setFormat(pos, len(m.group(g)), fmt)
-        for m in self._re_number.finditer(head):
-            if not self._in_spans(m.start(), spans): self.setFormat(m.start(), len(m.group(0)), self.f_num)
-        for m in self._re_ident.finditer(head):
-            pos = m.start()
-            if self._in_spans(pos, spans): continue
-            w = m.group(0)
-            if w in self._import_kw: self.setFormat(pos, len(w), self.f_import)
-            elif w in self._kw: self.setFormat(pos, len(w), self.f_kw)
-            elif w in self._builtins: self.setFormat(pos, len(w), self.f_builtin)
-            elif w in self._selfish: self.setFormat(pos, len(w), self.f_self)
-            elif len(w) >= 3 and w.isupper(): self.setFormat(pos, len(w), self.f_const)
+            end = text.find("'''" if prev == 1 else '"""')
+            if end == -1: return ((0, n, self.f_str),), prev
+            i = end + 3; emit((0, i, self.f_str))
+        search, ident_fmt = self._re_token.search, self._ident_fmt.get
+        while (m := search(text, i)):
+            kind, s, i = m.lastgroup, m.start(), m.end()
+            if kind == "ident":
+                w = m.group()
+                if (fmt := ident_fmt(w)): emit((s, i-s, fmt))
+                elif len(w) >= 3 and w.isupper(): emit((s, i-s, self.f_const))
+            elif kind == "str": emit((s, i-s, self.f_str))
+            elif kind == "num": emit((s, i-s, self.f_num))
+            elif kind == "def":
+                ns, kw = m.start("name"), m.group("defkw")
+                emit((s, len(kw), self.f_kw)); emit((ns, i-ns, self.f_def if kw == "def" else self.f_class))
+            elif kind == "deco": emit((s, i-s, self.f_deco))
+            elif kind == "cmt": emit((s, i-s, self.f_comment)); break
+            else:  # Triple-quoted string: close on this line or carry state to the next block
+                delim = m.group()[-3:]; e = text.find(delim, i)  # Drop any r/f/u prefix
+                if e == -1: emit((s, n-s, self.f_str)); return tuple(out), 1 if delim == "'''" else 2
+                i = e + 3; emit((s, i-s, self.f_str))
+        return tuple(out), 0
 
 class _LineArea(QWidget):
     def __init__(self, editor): super().__init__(editor); self.editor = editor
@@ -85,27 +108,68 @@ class _LineArea(QWidget):
 class _JobSignals(QObject): done = pyqtSignal(int, list)
 
 class _CompJob(QRunnable):
-    def __init__(self, rid: int, fn: Callable[[], list[str]]): super().__init__(); self.rid, self.fn, self.signals = rid, fn, _JobSignals()
+    def __init__(self, rid: int, fn: Callable[[], list[str]], cancel: threading.Event):
+        super().__init__(); self.rid, self.fn, self.cancel, self.signals = rid, fn, cancel, _JobSignals()
     def run(self) -> None:
+        if self.cancel.is_set(): return  # Superseded while queued
         try: items = self.fn()
         except: items = []
-        self.signals.done.emit(self.rid, items)
+        if not self.cancel.is_set(): self.signals.done.emit(self.rid, items)
+
+_re_word = re.compile(r"[A-Za-z_]\w+")
+_line_words: dict[str, frozenset[str]] = {}  # Line text -> its identifiers; only edited lines miss between requests
 
 def _fallback(code: str) -> list[str]:
-    return list(set(re.findall(r"[A-Za-z_]\w+", code)) | set(keyword.kwlist))
+    if len(_line_words) > 50_000: _line_words.clear()
+    words, get = set(_KW), _line_words.get
+    for line in code.split("\n"):
+        if (ws := get(line)) is None: ws = _line_words[line] = frozenset(_re_word.findall(line))
+        words |= ws
+    return list(words)
+
+@lru_cache(maxsize=8)
+def _jedi_project(root: str): return jedi.Project(path=root)
+
+@lru_cache(maxsize=2)
+def _jedi_script(code: str, path: Optional[str], root: str): return jedi.Script(code=code, path=path, project=_jedi_project(root))
+
+_jedi_lock = threading.Lock()  # Jedi's inference state isn't thread-safe; a shared Script makes that matter
+
+@lru_cache(maxsize=16)
+def _jedi_complete(code: str, path: Optional[str], root: str, line: int, col: int) -> tuple[str, ...]:
+    with _jedi_lock: return tuple(c.name for c in _jedi_script(code, path, root).complete(line, col) if getattr(c, "name", None))
+
+_re_prefix = re.compile(r"\w*$")
+_prefix_hits: dict[tuple, tuple[str, tuple[str, ...]]] = {}  # Text around the typed word -> (prefix, names) it was completed with
+
+def _complete(code: str, path: Optional[str], root: str, line: int, col: int, prefix: str) -> list[str]:
+    """Jedi names at (line, col); while only the word under the cursor grows, filter the earlier result instead."""
+    at = 0
+    for _ in range(line - 1): at = code.index("\n", at) + 1
+    at += col; key = (code[:at - len(prefix)], code[at:], path, root, line, col - len(prefix)); low = prefix.lower()
+    if (hit := _prefix_hits.get(key)) and low.startswith(hit[0]): return [n for n in hit[1] if n.lower().startswith(low)]
+    names = _jedi_complete(code, path, root, line, col)
+    if len(_prefix_hits) >= 32: _prefix_hits.clear()
+    _prefix_hits[key] = (low, names); return list(names)
 
 class PythonEditor(QPlainTextEdit):
     AUTO_MIN_PREFIX, AUTO_DELAY, JEDI_MAX = 3, 120, 200_000
+    _POOL: Optional[QThreadPool] = None
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self._ln_area = _LineArea(self); self._ctx_path: Optional[Path] = None; self._ctx_root = Path.cwd()
-        self._pool = QThreadPool.globalInstance(); self._rid = self._pending_rid = 0; self._pending_pos = -1
+        self._pool = self._comp_pool()
+        self._rid = self._pending_rid = 0; self._pending_pos = -1; self._cancel: Optional[threading.Event] = None
+        self._snap_rev, self._snapshot = -1, ""  # toPlainText() cache and the document revision it was taken at
+        self._prefix, self._prefix_pos = "", -1
         self.blockCountChanged.connect(lambda _: self._sync_margins())
         self.updateRequest.connect(self._update_ln)
+        self._line_sel = QTextEdit.ExtraSelection(); self._hl_key = (-1, -1)
+        self._line_sel.format.setBackground(_HL_LINE); self._line_sel.format.setProperty(QTextFormat.Property.FullWidthSelection, True)
         self.cursorPositionChanged.connect(self._hl_line)
         font = QFont("Consolas" if sys.platform.startswith("win") else "Monospace", 11)
-        font.setStyleHint(QFont.StyleHint.TypeWriter); self.setFont(font)
+        font.setStyleHint(QFont.StyleHint.TypeWriter); self.setFont(font); self._cache_metrics()
         self.setTabStopDistance(self.fontMetrics().horizontalAdvance(" ") * 4)
         self.setStyleSheet("QPlainTextEdit { background: #121212; color: #ddd; border: 1px solid #2b2b2b; border-radius: 2px; selection-background-color: #4688d8; }")
         self._hl = PythonHighlighter(self.document())
@@ -117,9 +181,28 @@ class PythonEditor(QPlainTextEdit):
         act = QAction(self); act.setShortcut(QKeySequence("Ctrl+Space")); act.triggered.connect(self._req_comp); self.addAction(act)
         self._sync_margins(); self._hl_line()
 
+    def setPlainText(self, text: str) -> None: self._hl.defer(); self._snap_rev = -1; super().setPlainText(text)
+
+    @classmethod
+    def _comp_pool(cls) -> QThreadPool:
+        """Completion pool shared by all editors; stale jobs are dropped via their cancel token."""
+        if cls._POOL is None:
+            cls._POOL = QThreadPool(); cls._POOL.setMaxThreadCount(max(1, (os.cpu_count() or 2) // 2)); cls._POOL.setExpiryTimeout(30_000)
+        return cls._POOL
+
     def set_context(self, fp: Optional[Path]) -> None: self._ctx_path = fp; self._ctx_root = fp.parent if fp else Path.cwd()
 
-    def _ln_width(self) -> int: return 12 + self.fontMetrics().horizontalAdvance("9") * max(2, len(str(self.blockCount())))
+    def _cache_metrics(self) -> None:
+        fm = self.fontMetrics(); self._digit_px, self._line_h, self._ln_digits, self._ln_w = fm.horizontalAdvance("9"), fm.height(), 0, 0
+
+    def changeEvent(self, e):
+        super().changeEvent(e)
+        if e.type() == QEvent.Type.FontChange: self._cache_metrics()
+
+    def _ln_width(self) -> int:
+        d = max(2, len(str(self.blockCount())))
+        if d != self._ln_digits: self._ln_digits, self._ln_w = d, 12 + self._digit_px * d
+        return self._ln_w
 
     def _sync_margins(self) -> None:
         w = self._ln_width(); self.setViewportMargins(w, 0, 0, 0)
@@ -133,24 +216,33 @@ class PythonEditor(QPlainTextEdit):
         if rect.contains(self.viewport().rect()): self._sync_margins()
 
     def _paint_ln(self, event):
-        painter = QPainter(self._ln_area); painter.fillRect(event.rect(), QColor("#1a1a1a"))
-        painter.setPen(QColor("#2b2b2b")); painter.drawLine(self._ln_area.width()-1, event.rect().top(), self._ln_area.width()-1, event.rect().bottom())
-        painter.setPen(QColor("#888")); block = self.firstVisibleBlock(); n = block.blockNumber()
+        rect, w = event.rect(), self._ln_area.width()
+        painter = QPainter(self._ln_area); painter.fillRect(rect, _LN_BG)
+        painter.setPen(_LN_SEP); painter.drawLine(w-1, rect.top(), w-1, rect.bottom())
+        painter.setPen(_LN_TEXT)
+        block = self.cursorForPosition(QPoint(0, rect.top())).block()  # Start at the dirty rect, not the viewport top
+        n, line_h, lo, hi = block.blockNumber(), self._line_h, rect.top(), rect.bottom()
         top = int(self.blockBoundingGeometry(block).translated(self.contentOffset()).top())
-        bottom = top + int(self.blockBoundingRect(block).height())
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                painter.drawText(0, top, self._ln_area.width()-6, self.fontMetrics().height(), Qt.AlignmentFlag.AlignRight, str(n+1))
-            block = block.next(); n += 1; top = bottom; bottom = top + int(self.blockBoundingRect(block).height())
+        one = 0  # Height of a single-line block; measured once, since only wrapped blocks differ
+        while block.isValid() and top <= hi:
+            if (single := block.lineCount() == 1) and one: bottom = top + one
+            else:
+                bottom = top + (h := int(self.blockBoundingRect(block).height()))
+                if single: one = h
+            if block.isVisible() and bottom >= lo: painter.drawText(0, top, w-6, line_h, Qt.AlignmentFlag.AlignRight, str(n+1))
+            block = block.next(); n += 1; top = bottom
 
     def _hl_line(self):
         if self.isReadOnly(): return
-        hl = QColor("#4688d8"); hl.setAlpha(35); sel = QTextEdit.ExtraSelection()
-        sel.format.setBackground(hl); sel.format.setProperty(QTextFormat.Property.FullWidthSelection, True)
-        sel.cursor = self.textCursor(); sel.cursor.clearSelection(); self.setExtraSelections([sel])
+        tc = self.textCursor(); layout = tc.block().layout()  # Wrapped lines: the full-width band covers one visual line
+        key = (tc.blockNumber(), layout.lineForTextPosition(tc.positionInBlock()).lineNumber() if layout else -1)
+        if key == self._hl_key: return  # Same visual line; Qt keeps the stored cursor on it across edits
+        self._hl_key = key; tc.clearSelection(); self._line_sel.cursor = tc; self.setExtraSelections([self._line_sel])
 
     def event(self, e):
-        if e.type() == QEvent.Type.FocusOut and self._completer.popup().isVisible(): self._completer.popup().hide()
+        if e.type() == QEvent.Type.FocusOut:
+            self._debounce.stop()
+            if self._completer.popup().isVisible(): self._completer.popup().hide()
         return super().event(e)
 
     def keyPressEvent(self, event):
@@ -159,8 +251,14 @@ class PythonEditor(QPlainTextEdit):
         super().keyPressEvent(event)
         t = event.text()
         if not t: return
-        if t == ".": self._debounce.start(0); return
-        if (t.isalnum() or t == "_") and len(self._word_under()) >= self.AUTO_MIN_PREFIX: self._debounce.start(self.AUTO_DELAY)
+        if not (t.isalnum() or t == "_"):
+            self._prefix_pos = -1
+            if t == ".": self._debounce.start(0)
+            return
+        pos = self.textCursor().position()  # Extend the tracked prefix while typing continues in place
+        self._prefix = self._prefix + t if pos == self._prefix_pos + 1 else self._word_under()
+        self._prefix_pos = pos
+        if len(self._prefix) >= self.AUTO_MIN_PREFIX: self._debounce.start(self.AUTO_DELAY)
 
     def _word_under(self) -> str: tc = self.textCursor(); tc.select(QTextCursor.SelectionType.WordUnderCursor); return tc.selectedText()
 
@@ -168,15 +266,19 @@ class PythonEditor(QPlainTextEdit):
         tc = self.textCursor(); tc.select(QTextCursor.SelectionType.WordUnderCursor); tc.removeSelectedText(); tc.insertText(comp); self.setTextCursor(tc)
 
     def _req_comp(self) -> None:
-        tc = self.textCursor(); pos = tc.position(); code = self.toPlainText()
+        self._debounce.stop()  # Ctrl+Space may fire while an auto-trigger is pending
+        if (rev := self.document().revision()) != self._snap_rev: self._snap_rev, self._snapshot = rev, self.toPlainText()
+        tc = self.textCursor(); pos = tc.position(); code = self._snapshot
         self._rid += 1; self._pending_rid = self._rid; self._pending_pos = pos
         line, col, root = tc.blockNumber()+1, tc.positionInBlock(), str(self._ctx_root)
-        path_str = str(self._ctx_path) if self._ctx_path else None
+        path_str = str(self._ctx_path) if self._ctx_path else None; prefix = _re_prefix.search(tc.block().text(), 0, col).group()
         def compute() -> list[str]:
             if jedi is None or len(code) > self.JEDI_MAX: return _fallback(code)
-            try: return [c.name for c in jedi.Script(code=code, path=path_str, project=jedi.Project(path=root)).complete(line, col) if getattr(c, "name", None)]
+            try: return _complete(code, path_str, root, line, col, prefix)
             except: return _fallback(code)
-        job = _CompJob(self._rid, compute); job.signals.done.connect(self._on_comp); self._pool.start(job)
+        if self._cancel: self._cancel.set()
+        self._cancel = threading.Event()
+        job = _CompJob(self._rid, compute, self._cancel); job.signals.done.connect(self._on_comp); self._pool.start(job)
 
     def _on_comp(self, rid: int, items: list[str]) -> None:
         if rid != self._pending_rid or self.textCursor().position() != self._pending_pos or not items: return
@@ -184,6 +286,7 @@ class PythonEditor(QPlainTextEdit):
         cr = self.cursorRect(); cr.setWidth(self._completer.popup().sizeHintForColumn(0)+30); self._completer.complete(cr)
 
 class EditorWindow(QWidget):
+    SAVE_CHUNK = 1 << 20
     TEMPLATE = '"""New Python script."""\n\ndef main():\n    pass\n\nif __name__ == "__main__":\n    main()\n'
 
     def __init__(self, filepath: Optional[str] = None, parent=None):
@@ -254,7 +357,9 @@ class EditorWindow(QWidget):
 
     def _load(self, path: Path) -> None:
         try:
-            self.editor.setPlainText(path.read_text(encoding="utf-8") if path.exists() else self.TEMPLATE)
+            try: text = path.read_text(encoding="utf-8")
+            except FileNotFoundError: text = self.TEMPLATE
+            self.editor.setPlainText(text)
             (doc := self.editor.document()) and doc.setModified(False); self._set_status("loaded")
         except Exception as e: QMessageBox.warning(self, "Error", f"Load failed:\n{e}")
         self._refresh_title()
@@ -265,7 +370,8 @@ class EditorWindow(QWidget):
             path.parent.mkdir(parents=True, exist_ok=True); text = self.editor.toPlainText().replace("\t", "    ")
             sf = QSaveFile(str(path))
             if not sf.open(sf.OpenModeFlag.WriteOnly | sf.OpenModeFlag.Text): raise OSError("Open failed")
-            if sf.write(text.encode("utf-8")) == -1: raise OSError("Write failed")
+            for i in range(0, len(text), self.SAVE_CHUNK):  # Bound the transient encoded copy on large files
+                if sf.write(text[i:i+self.SAVE_CHUNK].encode("utf-8")) == -1: raise OSError("Write failed")
             if not sf.commit(): raise OSError("Commit failed")
             (doc := self.editor.document()) and doc.setModified(False); self._set_status("saved")
         except Exception as e: QMessageBox.warning(self, "Error", f"Save failed:\n{e}")
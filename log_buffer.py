@@ -1,19 +1,33 @@
 """Log buffer - Ring buffer with async file persistence (non-blocking UI)."""
 from __future__ import annotations
-import atexit, queue, threading
+import atexit, os, re, threading, time
+from array import array
+from bisect import bisect_left, bisect_right
 from collections import deque
-from datetime import datetime
+from itertools import accumulate
 from pathlib import Path
 from typing import Optional
 from config import LOGS_DIR, MAX_LOG_LINES, HISTORY_CHUNK, normalize, strip_ansi
 
+_TS_RE = re.compile(r"^\[([^\]\n]*)\]", re.M)  # Leading "[timestamp]" of each stored line
+_TS_COLOR = "[\x1b[94m\\1\x1b[0m]"
+
+_stamp_sec, _stamp_str = -1, ""
+
+def _stamp() -> str:
+    """Current local time as log text; formatted at most once per second."""
+    global _stamp_sec, _stamp_str
+    if (sec := int(time.time())) != _stamp_sec: _stamp_sec, _stamp_str = sec, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+    return _stamp_str
+
 class _AsyncWriter:
     """Background thread for non-blocking log file writes."""
     _instance: Optional["_AsyncWriter"] = None
 
     def __init__(self):
-        self._q: queue.Queue[tuple[Path, str]] = queue.Queue(maxsize=10000)
-        self._stop = threading.Event()
+        self._q: deque[tuple[Path, Optional[str]]] = deque()  # append/popleft are atomic, so the UI thread never takes a lock
+        self._stop, self._wake = threading.Event(), threading.Event()
+        self._fds: dict[Path, int] = {}  # Append-mode descriptors, opened on first write and kept until release()/close()
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
         atexit.register(self.close)
@@ -24,91 +38,182 @@ class _AsyncWriter:
         return cls._instance
 
     def write(self, path: Path, text: str) -> None:
-        if text:
-            try: self._q.put_nowait((path, text))
-            except queue.Full: pass  # Drop rather than block UI
+        if text and len(self._q) < 10000:  # Drop rather than block UI
+            self._q.append((path, text))
+            if not self._wake.is_set(): self._wake.set()
+
+    def release(self, path: Path) -> None:
+        """Close the descriptor for path on the writer thread, after anything already queued for it."""
+        self._q.append((path, None))
+        if not self._wake.is_set(): self._wake.set()
 
     def _run(self) -> None:
-        while not self._stop.is_set() or not self._q.empty():
-            try: path, text = self._q.get(timeout=0.2)
-            except queue.Empty: continue
-            try:
-                path.parent.mkdir(exist_ok=True)
-                with open(path, "a", encoding="utf-8", newline="\n") as f: f.write(text)
-            except: pass
-            finally:
-                try: self._q.task_done()
+        q = self._q
+        while not self._stop.is_set() or q:
+            if not q: self._wake.wait(0.2); self._wake.clear(); continue
+            batch = []  # Drain whatever queued up meanwhile so a spammy process costs one write per file, not per batch
+            while q and len(batch) < 1000: batch.append(q.popleft())
+            pending: dict[Path, list[str]] = {}; released = set()
+            for path, text in batch:
+                if text is None: released.add(path)
+                else: pending.setdefault(path, []).append(text)
+            for path, texts in pending.items():
+                try:
+                    if (fd := self._fds.get(path)) is None:
+                        path.parent.mkdir(exist_ok=True)
+                        fd = self._fds[path] = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0), 0o644)
+                    data = "".join(texts).encode("utf-8")
+                    while data: data = data[os.write(fd, data):]
                 except: pass
+            for path in released:  # Writes batched with the release land first; a later write reopens
+                if (fd := self._fds.pop(path, None)) is not None:
+                    try: os.close(fd)
+                    except: pass
 
     def close(self) -> None:
-        self._stop.set()
+        self._stop.set(); self._wake.set()
         try: self._thread.join(timeout=2.0)
         except: pass
+        for fd in self._fds.values():
+            try: os.close(fd)
+            except: pass
+        self._fds.clear()
 
 class LogBuffer:
-    __slots__ = ("name", "lines", "file", "_cache", "_mtime", "_partial")
+    __slots__ = ("name", "lines", "file", "_offs", "_partial", "_low", "_low_at", "_recent", "_lock", "_found")
 
     def __init__(self, name: str):
         self.name = name
         self.lines: deque[str] = deque(maxlen=MAX_LOG_LINES)
         LOGS_DIR.mkdir(exist_ok=True)
         self.file = LOGS_DIR / f"{name}.log"
-        self._cache: Optional[list[str]] = None
-        self._mtime: float = 0
         self._partial: str = ""
+        self._recent: Optional[str] = ""  # get_recent() result; None once lines changed
+        self._lock = threading.RLock()
+        self._reset()
 
-    def append(self, text: str) -> tuple[str, str]:
+    def _reset(self) -> None:
+        self._offs = array("Q", [0])  # File offset where each indexed line starts, then the end of the last one
+        self._low, self._low_at = "", array("Q")  # Lowercased lines joined by "\n" and their starts in it; grown by search
+        self._found: dict[tuple[str, int], tuple[str, int]] = {}  # (query, line count) -> search() result
+
+    def append(self, text: str, live: bool = True) -> tuple[str, str]:
+        """Timestamp complete lines; display text is only built for a live viewer, recent lines keep the plain prefix."""
         if not text: return "", ""
         data = normalize(self._partial + text); self._partial = ""
         if "\n" not in data: self._partial = data; return "", ""
         
-        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        parts = data.splitlines(keepends=True)
-        if parts and not parts[-1].endswith("\n"): self._partial = parts.pop()
-        
-        display, file_out = [], []
-        for part in parts:
-            content = part.rstrip("\n")
-            disp = f"[\x1b[94m{ts}\x1b[0m] {content}\n"
-            self.lines.append(disp); display.append(disp)
-            file_out.append(f"[{ts}] {strip_ansi(content)}\n")
-        
-        self._cache = None
-        _AsyncWriter.get().write(self.file, "".join(file_out))
-        return "".join(display), "".join(file_out)
-
-    def get_recent(self) -> str: return "".join(self.lines)
-
-    def _read_file(self) -> list[str]:
-        if not self.file.exists(): return [l.rstrip("\n") for l in self.lines]
-        try:
-            mtime = self.file.stat().st_mtime
-            if self._cache and mtime == self._mtime: return self._cache
-            self._cache = normalize(self.file.read_text(encoding="utf-8", errors="replace")).splitlines()
-            self._mtime = mtime
-            return self._cache
-        except: return [l.rstrip("\n") for l in self.lines]
-
-    def line_count(self) -> int: return len(self._read_file())
-
-    def _colorize(self, line: str) -> str:
-        if line.startswith("[") and (b := line.find("]")) > 0:
-            return f"[\x1b[94m{line[1:b]}\x1b[0m]{line[b+1:]}"
-        return line
-
-    def search(self, pattern: str) -> tuple[str, int]:
-        p = pattern.lower()
-        matches = [l for l in self._read_file() if p in l.lower()]
-        return ("".join(f"{self._colorize(l)}\n" for l in matches), len(matches)) if matches else ("", 0)
+        ts, cut = _stamp(), data.rfind("\n")
+        body, self._partial = data[:cut], data[cut + 1:]
+        fpre, lines = f"[{ts}] ", body.split("\n")  # Prefix whole batches with one join instead of formatting per line
+        display = (dpre := f"[\x1b[94m{ts}\x1b[0m] ") + f"\n{dpre}".join(lines) + "\n" if live else ""
+        file_out = fpre + f"\n{fpre}".join(strip_ansi(body).split("\n")) + "\n"
+        self.lines.extend(f"{fpre}{l}\n" for l in lines[-MAX_LOG_LINES:]); self._recent = None
+        _AsyncWriter.get().write(self.file, file_out)
+        return display, file_out
+
+    def get_recent(self) -> str:
+        if self._recent is None: self._recent = _TS_RE.sub(_TS_COLOR, "".join(self.lines))
+        return self._recent
+
+    def _index(self) -> int:
+        """Index complete lines appended to the file since the last call; line count, or -1 if unreadable."""
+        with self._lock:  # Search may index from a worker thread
+            try:
+                if (size := self.file.stat().st_size) < self._offs[-1]: self._reset()  # Truncated
+                offs = self._offs; pos = offs[-1]
+                if size > pos:
+                    with open(self.file, "rb") as f:
+                        f.seek(pos); data = b""
+                        while pos + len(data) < size:  # Bounded reads; only newline positions are kept
+                            if not (chunk := f.read(min(size - pos - len(data), 1 << 24))): break  # Shrunk since stat
+                            data += chunk
+                            if end := data.rfind(b"\n") + 1:
+                                offs.pop(); offs.extend(accumulate(map((1).__add__, map(len, data[:end - 1].split(b"\n"))), initial=pos))
+                                pos += end; data = data[end:]
+                    if self.file.stat().st_size < offs[-1]: self._reset()  # Truncated mid-read; reindex next call
+                return len(self._offs) - 1
+            except: return -1
+
+    def _recent_lines(self) -> list[str]: return [l[:-1] for l in list(self.lines)]  # Snapshot first; search may call this off the UI thread
+
+    def _read(self, start: int, end: int) -> list[str]:
+        offs = self._offs
+        with open(self.file, "rb") as f: f.seek(offs[start]); data = f.read(offs[end] - offs[start] - 1)
+        return normalize(data.decode("utf-8", errors="replace")).split("\n")
+
+    def line_count(self) -> int: return n if (n := self._index()) >= 0 else len(self.lines)
+
+    @staticmethod
+    def _colorize(lines: list[str]) -> str: return _TS_RE.sub(_TS_COLOR, "\n".join(lines) + "\n")
+
+    def _chunks(self, offs: array, a: int, n: int, abort: Optional[threading.Event] = None):
+        """Read lines a..n in line-aligned pieces of about 16 MiB as (first line, end line, bytes); stops early once aborted."""
+        with open(self.file, "rb") as f:  # Plain reads, not mmap: clear() may truncate underneath, which only shortens a read
+            f.seek(offs[a])
+            while a < n and not (abort and abort.is_set()):
+                b = min(max(bisect_right(offs, offs[a] + (1 << 24), a + 1, n + 1) - 1, a + 1), n)
+                yield a, b, f.read(offs[b] - offs[a]); a = b
+
+    def _lowered(self, n: int, offs: array, abort: Optional[threading.Event] = None) -> Optional[tuple[str, array]]:
+        """Lowercased lines joined by "\n" and their starts in it, grown to n lines outside the lock; None if aborted."""
+        with self._lock: low, at = self._low, self._low_at
+        if (k := len(at)) < n:
+            parts, at, pos = [low], array("Q", at), len(low)
+            for _, _, data in self._chunks(offs, k, n, abort):
+                new = [l.lower() for l in data[:-1].decode("utf-8", errors="replace").split("\n")]
+                for l in new: at.append(pos); pos += len(l) + 1
+                parts.append("\n".join(new) + "\n")
+            if abort and abort.is_set(): return None
+            low = "".join(parts)
+            with self._lock:  # Keep the growth unless clear() reset the index or another search got there first
+                if self._offs is offs and len(self._low_at) == k: self._low, self._low_at = low, at
+        return low, at
+
+    def search(self, pattern: str, abort: Optional[threading.Event] = None) -> tuple[str, int]:
+        with self._lock:  # Only to snapshot the index; scanning unlocked keeps line_count()/clear() on the UI thread from waiting
+            p, n = pattern.lower(), self._index(); offs = self._offs
+            if (hit := self._found.get((p, n))) is not None: return hit  # Lines only append, so the count versions the file
+        if n < 0: matches = [l for l in self._recent_lines() if p in l.lower()]
+        elif not p: matches = [l for _, _, data in self._chunks(offs, 0, n, abort) for l in normalize(data[:-1].decode("utf-8", errors="replace")).split("\n")]
+        elif p == p.upper():  # Nothing to case-fold (timestamps, numbers): find the UTF-8 bytes in each piece directly
+            needle, matches = p.encode("utf-8"), []
+            for a, b, data in self._chunks(offs, 0, n, abort):
+                base = offs[a]; pos = data.find(needle)
+                while pos >= 0:
+                    i = bisect_right(offs, base + pos, a, b + 1) - 1
+                    matches.append(normalize(data[offs[i] - base:offs[i + 1] - base - 1].decode("utf-8", errors="replace"))); pos = data.find(needle, offs[i + 1] - base)
+                    if abort and not len(matches) & 255 and abort.is_set(): return "", 0
+        else:  # str.find over one lowercased string, then jump to the next line after each hit
+            if (lowered := self._lowered(n, offs, abort)) is None: return "", 0
+            (low, at), hits = lowered, []; end = at[n] if len(at) > n else len(low); pos = low.find(p, 0, end)
+            while pos >= 0:
+                hits.append(bisect_right(at, pos) - 1); pos = low.find(p, low.find("\n", pos) + 1, end)
+                if abort and not len(hits) & 255 and abort.is_set(): return "", 0
+            matches = []  # Read from the first hit to the last, decoding only the hit lines
+            for a, b, data in self._chunks(offs, hits[0], hits[-1] + 1, abort) if hits else ():
+                base = offs[a]
+                for i in hits[bisect_left(hits, a):bisect_left(hits, b)]: matches.append(normalize(data[offs[i] - base:offs[i + 1] - base - 1].decode("utf-8", errors="replace")))
+        if abort and abort.is_set(): return "", 0
+        found = (self._colorize(matches), len(matches)) if matches else ("", 0)
+        if n >= 0:
+            with self._lock:
+                if self._offs is offs:  # Not cached across a clear()
+                    if len(self._found) >= 8: del self._found[next(iter(self._found))]
+                    self._found[(p, n)] = found
+        return found
 
     def load_chunk(self, end: int, size: int = HISTORY_CHUNK) -> tuple[str, int]:
-        lines = self._read_file()
-        if not lines or end <= 0: return "", 0
-        start = max(0, end - size)
-        chunk = lines[start:end]
-        return ("".join(f"{self._colorize(l)}\n" for l in chunk), start) if chunk else ("", 0)
+        lines = self._recent_lines() if (n := self._index()) < 0 else None
+        start, end = max(0, end - size), min(end, len(lines) if lines is not None else n)
+        if start >= end: return "", 0
+        return self._colorize(lines[start:end] if lines is not None else self._read(start, end)), start
+
+    def close(self) -> None: _AsyncWriter.get().release(self.file)  # Let go of the log file once the bot is deleted
 
     def clear(self) -> None:
-        self.lines.clear(); self._cache = None
-        try: self.file.write_text("", encoding="utf-8")
-        except: pass
+        self.lines.clear(); self._recent = ""
+        with self._lock:
+            self._reset()
+            try: os.truncate(self.file, 0)  # The writer's O_APPEND descriptor follows the new end
+            except OSError: pass
@@ -1,19 +1,30 @@
 """Log View - Per-bot log viewer with live/history/search modes."""
 from __future__ import annotations
-import os, subprocess, sys
+import os, subprocess, sys, threading
 from enum import Enum, auto
-from typing import TYPE_CHECKING
-from PyQt6.QtCore import Qt, QTimer
+from typing import TYPE_CHECKING, Optional
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QKeySequence, QShortcut, QTextCursor
 from PyQt6.QtWidgets import QHBoxLayout, QLabel, QLineEdit, QPushButton, QVBoxLayout, QWidget, QFrame
 from console import AnsiConsole
 from log_buffer import LogBuffer
-from config import MAX_FLUSH_CHARS, BTN
+from config import MAX_FLUSH_CHARS, MAX_LOG_LINES, BTN
 if TYPE_CHECKING: from stats import ProcessStats
 
 class Mode(Enum):
     LIVE = auto(); HISTORY = auto(); SEARCH = auto()
 
+class _SearchSignals(QObject): done = pyqtSignal(int, str, int)
+
+class _SearchJob(QRunnable):
+    def __init__(self, sid: int, buffer: LogBuffer, query: str, abort: threading.Event):
+        super().__init__(); self.sid, self.buffer, self.query, self.abort, self.signals = sid, buffer, query, abort, _SearchSignals()
+    def run(self) -> None:
+        if self.abort.is_set(): return  # Superseded while queued
+        try: text, count = self.buffer.search(self.query, self.abort)
+        except: text, count = "", 0
+        if not self.abort.is_set(): self.signals.done.emit(self.sid, text, count)
+
 class LogView(QWidget):
     def __init__(self, name: str, buffer: LogBuffer):
         super().__init__()
@@ -21,6 +32,7 @@ class LogView(QWidget):
         self._pending: list[str] = []
         self._mode = Mode.LIVE
         self._hist_start = self._hist_end = 0
+        self._search_id = 0; self._search_abort: Optional[threading.Event] = None
         self._setup_ui()
         QTimer.singleShot(0, self._go_live)
 
@@ -66,11 +78,11 @@ class LogView(QWidget):
         QShortcut(QKeySequence(Qt.Key.Key_Escape), self.search_input, self._exit_search)
 
     def _update_ui(self) -> None:
-        total = self.buffer.line_count()
+        total = self.buffer.line_count() if self._mode != Mode.SEARCH else 0  # A running search holds the buffer lock
         if self._mode == Mode.LIVE:
             self.mode_label.setText("● LIVE"); self.mode_label.setStyleSheet("color: #8f8; font-family: monospace;")
             self.btn_older.setEnabled(total > 0); self.btn_live.setEnabled(False); self.btn_clear.setEnabled(False)
-            self.line_info.setText(f"{len(self.buffer.lines):,} lines")
+            self._show_line_count()
         elif self._mode == Mode.HISTORY:
             self.mode_label.setText("● HISTORY"); self.mode_label.setStyleSheet("color: #ff8; font-family: monospace;")
             self.btn_older.setEnabled(self._hist_start > 0); self.btn_live.setEnabled(True); self.btn_clear.setEnabled(False)
@@ -92,9 +104,12 @@ class LogView(QWidget):
         except: pass
 
     def _go_live(self) -> None:
-        self._mode = Mode.LIVE; self.search_input.clear(); self.search_label.setText("")
+        self._cancel_search(); self._mode = Mode.LIVE; self.search_input.clear(); self.search_label.setText(""); self._set_live_cap(True)
         self.console.set_content(self.buffer.get_recent()); self._scroll_end(); self._update_ui()
 
+    @property
+    def live(self) -> bool: return self._mode == Mode.LIVE
+
     def append(self, text: str) -> None: self._pending.append(text)
 
     def flush(self) -> None:
@@ -107,7 +122,13 @@ class LogView(QWidget):
         sb = self.console.verticalScrollBar(); at_bottom = sb.value() >= sb.maximum() - 50
         self.console.setUpdatesEnabled(False); self.console.append_text(text); self.console.setUpdatesEnabled(True)
         if at_bottom: sb.setValue(sb.maximum())
-        self.line_info.setText(f"{len(self.buffer.lines):,} lines")
+        self._show_line_count()
+
+    def _show_line_count(self) -> None: self.line_info.setText(f"{max(0, self.console.document().blockCount() - 1):,} lines")
+
+    def _set_live_cap(self, live: bool) -> None:
+        # Qt drops the oldest blocks itself while live; history and search prepend, so they must not be trimmed
+        self.console.document().setMaximumBlockCount(MAX_LOG_LINES if live else 0)
 
     def _load_older(self) -> None:
         if self._mode == Mode.SEARCH: return
@@ -117,7 +138,7 @@ class LogView(QWidget):
         self.console.setUpdatesEnabled(False)
         try:
             if self._mode == Mode.LIVE:
-                self._mode = Mode.HISTORY; self._hist_end = total
+                self._mode = Mode.HISTORY; self._hist_end = total; self._set_live_cap(False)
                 text, self._hist_start = self.buffer.load_chunk(total, 10000)
                 self.console.set_content(text); self._scroll_end()
             else:
@@ -133,14 +154,24 @@ class LogView(QWidget):
     def _do_search(self) -> None:
         query = self.search_input.text().strip()
         if not query: self._exit_search(); return
-        self._mode = Mode.SEARCH; self.search_label.setText("Searching...")
+        self._cancel_search(); self._mode = Mode.SEARCH; self._set_live_cap(False)
+        self.search_label.setText("Searching..."); self.search_label.setStyleSheet("color: #888; font-size: 11px;")
+        self._search_id += 1; self._search_abort = abort = threading.Event()
+        job = _SearchJob(self._search_id, self.buffer, query, abort); job.signals.done.connect(self._on_search_done)
+        QThreadPool.globalInstance().start(job); self._update_ui()
+
+    def _on_search_done(self, sid: int, results: str, count: int) -> None:
+        if sid != self._search_id or self._mode != Mode.SEARCH: return
+        self._search_abort = None
         self.console.setUpdatesEnabled(False)
         try:
-            results, count = self.buffer.search(query)
             self.console.set_content(results)
             self.search_label.setText(f"{count:,} matches" if count else "No matches")
             self.search_label.setStyleSheet(f"color: {'#8f8' if count else '#f88'}; font-size: 11px;")
-        finally: self.console.setUpdatesEnabled(True); self._update_ui()
+        finally: self.console.setUpdatesEnabled(True)
+
+    def _cancel_search(self) -> None:
+        if self._search_abort: self._search_abort.set(); self._search_abort = None
 
     def _exit_search(self) -> None:
         self.search_input.clear(); self.search_label.setText("")
@@ -151,6 +182,6 @@ class LogView(QWidget):
         self.console.verticalScrollBar().setValue(self.console.verticalScrollBar().maximum())
 
     def _clear_view(self) -> None:
-        self.console.clear(); self.console._reset(); self._mode = Mode.LIVE; self.search_label.setText(""); self._update_ui()
+        self.console.clear(); self.console._reset(); self._mode = Mode.LIVE; self._set_live_cap(True); self.search_label.setText(""); self._update_ui()
 
-    def _clear_all(self) -> None: self.buffer.clear(); self._clear_view()
+    def _clear_all(self) -> None: self._cancel_search(); self.buffer.clear(); self._clear_view()
@@ -1,9 +1,10 @@
 """Main Window - Bot configuration and log viewer."""
 from __future__ import annotations
-import sys
+import sys, time
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
 from typing import Optional
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import QSignalBlocker, Qt, QTimer
 from PyQt6.QtGui import QKeySequence, QShortcut
 from PyQt6.QtWidgets import (QCheckBox, QComboBox, QFileDialog, QHBoxLayout, QInputDialog, QLabel, QLineEdit,
     QMainWindow, QMessageBox, QPlainTextEdit, QPushButton, QSplitter, QTabWidget, QVBoxLayout, QWidget, QProxyStyle, QStyle)
@@ -14,6 +15,13 @@ from process_mgr import ProcessManager
 from stats import ProcessStats, StatsMonitor
 from editor import EditorWindow
 
+@contextmanager
+def _blocked(*widgets: QWidget):
+    """Block signals on widgets for the duration; unblocked even if the body raises."""
+    with ExitStack() as stack:
+        for w in widgets: stack.enter_context(QSignalBlocker(w))
+        yield
+
 class NoSeamStyle(QProxyStyle):
     def drawPrimitive(self, el, opt, painter, widget=None):
         if el in (QStyle.PrimitiveElement.PE_FrameTabWidget, QStyle.PrimitiveElement.PE_FrameTabBarBase): return
@@ -24,18 +32,29 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle(f"Pythonator v{__version__}")
         self.resize(1200, 750)
-        self.bots = load_config()
+        self.bots: dict[str, Bot] = {}
         self.buffers: dict[str, LogBuffer] = {}
-        self.views: dict[str, LogView] = {}
+        self.views: dict[str, LogView] = {}  # Built on first show; until then the tab holds an empty placeholder
+        self._pages: dict[str, QWidget] = {}  # Widget currently in each bot's tab
+        self._view_names: dict[QWidget, str] = {}  # Reverse of _pages, for tab switches
         self._editors: dict[str, EditorWindow] = {}
         self._scratch: Optional[EditorWindow] = None
         self.proc_mgr = ProcessManager(on_output=self._on_output, on_finished=self._on_finished)
         self.stats = StatsMonitor()
         self._syncing = False
+        self._form_bot = ""  # Bot whose settings the form currently shows
+        self._save_timer = QTimer(self); self._save_timer.setSingleShot(True); self._save_timer.timeout.connect(self._flush_config)
+        self._save_due = 0.0  # Latest monotonic time the pending config write may be pushed back to
+        self._ready = False  # Widgets and timers exist only once _init_deferred has run
+        QTimer.singleShot(0, self._init_deferred)  # Let the window paint before building widgets and loading bots
+
+    def _init_deferred(self) -> None:
+        self.bots = load_config()
         self._build_ui()
         self._load_bots()
         self._flush_timer = QTimer(self); self._flush_timer.timeout.connect(self._flush); self._flush_timer.start(FLUSH_INTERVAL_MS)
         self._stats_timer = QTimer(self); self._stats_timer.timeout.connect(self._update_stats); self._stats_timer.start(STATS_INTERVAL_MS)
+        self._ready = True
 
     def _build_ui(self) -> None:
         root = QWidget(); self.setCentralWidget(root)
@@ -51,8 +70,7 @@ class MainWindow(QMainWindow):
         layout.addLayout(top)
 
         # Splitter
-        splitter = QSplitter(Qt.Orientation.Horizontal); splitter.setHandleWidth(9)
-        splitter.setStyleSheet("QSplitter::handle:horizontal:hover { background: qlineargradient(x1:0,y1:0,x2:1,y2:0,stop:0.45 transparent,stop:0.5 #3a3a3a,stop:0.55 transparent); }")
+        splitter = QSplitter(Qt.Orientation.Horizontal); splitter.setHandleWidth(9); splitter.setObjectName("mainSplitter")  # Styled by config.STYLE
         splitter.addWidget(self._build_config()); splitter.addWidget(self._build_logs())
         splitter.setStretchFactor(0, 1); splitter.setStretchFactor(1, 2)
         layout.addWidget(splitter, 1)
@@ -66,8 +84,7 @@ class MainWindow(QMainWindow):
         
         # Bot selector
         row = QHBoxLayout(); row.setSpacing(4); row.addWidget(QLabel("Bot:"))
-        self.bot_combo = QComboBox()
-        self.bot_combo.setStyleSheet("QComboBox { padding: 4px 8px; border: 1px solid #333; border-radius: 2px; background: #1a1a1a; } QComboBox:hover { border-color: #444; } QComboBox::drop-down { border: none; width: 20px; } QComboBox QAbstractItemView { background: #1a1a1a; border: 1px solid #333; selection-background-color: #4688d8; }")
+        self.bot_combo = QComboBox(); self.bot_combo.setObjectName("botCombo")
         self.bot_combo.currentTextChanged.connect(self._on_combo_changed); row.addWidget(self.bot_combo, 1)
         btn_add = QPushButton("+"); btn_add.setFixedWidth(28); btn_add.setStyleSheet(BTN); btn_add.clicked.connect(self._add_bot); row.addWidget(btn_add)
         self.btn_del = QPushButton("×"); self.btn_del.setFixedWidth(28); self.btn_del.setStyleSheet(BTN); self.btn_del.clicked.connect(self._del_bot); row.addWidget(self.btn_del)
@@ -76,7 +93,7 @@ class MainWindow(QMainWindow):
         # Entry
         layout.addWidget(QLabel("Entry:"))
         entry_row = QHBoxLayout(); entry_row.setSpacing(4)
-        self.entry_input = QLineEdit(); self.entry_input.setPlaceholderText("Path to Python script"); self.entry_input.setStyleSheet(INPUT); self.entry_input.textChanged.connect(self._save_bot)
+        self.entry_input = QLineEdit(); self.entry_input.setPlaceholderText("Path to Python script"); self.entry_input.setStyleSheet(INPUT); self.entry_input.editingFinished.connect(self._save_bot)
         entry_row.addWidget(self.entry_input, 1)
         self.btn_edit = QPushButton("✎"); self.btn_edit.setFixedWidth(28); self.btn_edit.setStyleSheet(BTN); self.btn_edit.clicked.connect(self._edit_entry); entry_row.addWidget(self.btn_edit)
         btn_browse = QPushButton("…"); btn_browse.setFixedWidth(28); btn_browse.setStyleSheet(BTN); btn_browse.clicked.connect(self._browse_entry); entry_row.addWidget(btn_browse)
@@ -85,7 +102,7 @@ class MainWindow(QMainWindow):
         # Python path
         layout.addWidget(QLabel("Python:"))
         py_row = QHBoxLayout(); py_row.setSpacing(4)
-        self.python_input = QLineEdit(); self.python_input.setPlaceholderText("Auto-detect from venv"); self.python_input.setStyleSheet(INPUT); self.python_input.textChanged.connect(self._save_bot)
+        self.python_input = QLineEdit(); self.python_input.setPlaceholderText("Auto-detect from venv"); self.python_input.setStyleSheet(INPUT); self.python_input.editingFinished.connect(self._save_bot)
         py_row.addWidget(self.python_input, 1)
         btn_detect = QPushButton("⌕"); btn_detect.setFixedWidth(28); btn_detect.setStyleSheet(BTN); btn_detect.clicked.connect(self._detect_python); py_row.addWidget(btn_detect)
         btn_browse_py = QPushButton("…"); btn_browse_py.setFixedWidth(28); btn_browse_py.setStyleSheet(BTN); btn_browse_py.clicked.connect(self._browse_python); py_row.addWidget(btn_browse_py)
@@ -96,7 +113,7 @@ class MainWindow(QMainWindow):
 
         # Flags
         self.flags_label = QLabel("Flags:"); layout.addWidget(self.flags_label)
-        self.flags_input = QLineEdit(); self.flags_input.setPlaceholderText("Arguments"); self.flags_input.setStyleSheet(INPUT); self.flags_input.textChanged.connect(self._save_bot); layout.addWidget(self.flags_input)
+        self.flags_input = QLineEdit(); self.flags_input.setPlaceholderText("Arguments"); self.flags_input.setStyleSheet(INPUT); self.flags_input.editingFinished.connect(self._save_bot); layout.addWidget(self.flags_input)
 
         # Requirements
         layout.addWidget(QLabel("Requirements:"))
@@ -125,48 +142,75 @@ class MainWindow(QMainWindow):
         ctrl.addWidget(self.btn_start); ctrl.addWidget(self.btn_stop); ctrl.addWidget(self.btn_restart); ctrl.addStretch()
         layout.addLayout(ctrl)
 
-        self.tabs = QTabWidget(); self.tabs.setStyle(NoSeamStyle(self.tabs.style())); self.tabs.setMovable(True); self.tabs.setDocumentMode(True)
-        self.tabs.setStyleSheet("QTabWidget::pane { border: 1px solid #2a2a2a; border-top: none; border-radius: 0 0 2px 2px; } QTabBar::tab { background: #1a1a1a; border: 1px solid #2a2a2a; border-bottom: none; padding: 6px 16px; margin-right: 2px; border-radius: 2px 2px 0 0; } QTabBar::tab:selected { background: #252525; border-color: #252525; } QTabBar::tab:hover:!selected { background: #202020; }")
+        self.tabs = QTabWidget(); self.tabs.setObjectName("logTabs"); self.tabs.setStyle(NoSeamStyle(self.tabs.style())); self.tabs.setMovable(True); self.tabs.setDocumentMode(True)
         self.tabs.currentChanged.connect(self._on_tab_changed)
         layout.addWidget(self.tabs, 1)
         return panel
 
     def _load_bots(self) -> None:
-        for name in self.bots: self._create_views(name)
+        # Build every tab and combo entry as one batch: no repaint or tab/combo signal per bot
+        self.setUpdatesEnabled(False)
+        try:
+            with _blocked(self.tabs, self.bot_combo):
+                for name in self.bots: self._create_views(name, combo=False)
+                self.bot_combo.addItems([n for n in self.bots if self.bot_combo.findText(n) < 0])
+        finally: self.setUpdatesEnabled(True)
         if self.bots:
-            first = next(iter(self.bots)); self.bot_combo.setCurrentText(first); self._load_bot_ui(first)
+            first = next(iter(self.bots)); self.bot_combo.setCurrentText(first); self._load_bot_ui(first); self._ensure_view(first)
         self._update_ui()
 
-    def _create_views(self, name: str) -> None:
+    def _create_views(self, name: str, combo: bool = True) -> None:
         if name not in self.buffers: self.buffers[name] = LogBuffer(name)
-        if name not in self.views: self.views[name] = LogView(name, self.buffers[name]); self.tabs.addTab(self.views[name], name)
-        if self.bot_combo.findText(name) < 0: self.bot_combo.addItem(name)
+        if name not in self._pages: self._pages[name] = page = QWidget(); self._view_names[page] = name; self.tabs.addTab(page, name)
+        if combo and self.bot_combo.findText(name) < 0: self.bot_combo.addItem(name)
+
+    def _ensure_view(self, name: str) -> None:
+        """Swap the bot's placeholder tab for its LogView the first time it is shown."""
+        if name in self.views or (page := self._pages.get(name)) is None: return
+        view = self.views[name] = LogView(name, self.buffers[name]); idx = self.tabs.indexOf(page)
+        with _blocked(self.tabs):
+            current = self.tabs.currentIndex() == idx
+            self.tabs.removeTab(idx); self.tabs.insertTab(idx, view, name)
+            if current: self.tabs.setCurrentIndex(idx)
+        self._pages[name] = view; self._view_names.pop(page, None); self._view_names[view] = name; page.deleteLater()
 
     def _load_bot_ui(self, name: str) -> None:
         bot = self.bots.get(name)
         if not bot: return
-        for w in (self.entry_input, self.flags_input, self.reqs_input, self.python_input, self.custom_check): w.blockSignals(True)
-        self.entry_input.setText(bot.entry); self.flags_input.setText(bot.flags); self.reqs_input.setPlainText(bot.reqs)
-        self.python_input.setText(bot.python_path); self.custom_check.setChecked(bot.custom_cmd)
+        self._form_bot = name
+        with _blocked(self.entry_input, self.flags_input, self.reqs_input, self.python_input, self.custom_check):
+            self.entry_input.setText(bot.entry); self.flags_input.setText(bot.flags); self.reqs_input.setPlainText(bot.reqs)
+            self.python_input.setText(bot.python_path); self.custom_check.setChecked(bot.custom_cmd)
         is_custom = bot.custom_cmd
         self.flags_label.setText("Command:" if is_custom else "Flags:")
         self.flags_input.setPlaceholderText("e.g., uvicorn main:app" if is_custom else "Arguments")
         self.entry_input.setEnabled(not is_custom); self.btn_edit.setEnabled(not is_custom)
-        for w in (self.entry_input, self.flags_input, self.reqs_input, self.python_input, self.custom_check): w.blockSignals(False)
 
     def _save_bot(self) -> None:
-        name = self.bot_combo.currentText()
-        if not name: return
-        self.bots[name] = Bot(name=name, entry=self.entry_input.text().strip(), reqs=self.reqs_input.toPlainText().strip(),
-                              flags=self.flags_input.text().strip(), custom_cmd=self.custom_check.isChecked(), python_path=self.python_input.text().strip())
-        save_config(self.bots)
+        name = self._form_bot
+        if not name or name not in self.bots: return
+        for w in (self.entry_input, self.flags_input, self.python_input): w.setModified(False)
+        b = self.bots[name]  # Mutable slots dataclass: update the fields rather than allocate a new Bot per edit
+        b.entry, b.reqs, b.flags = self.entry_input.text().strip(), self.reqs_input.toPlainText().strip(), self.flags_input.text().strip()
+        b.custom_cmd, b.python_path = self.custom_check.isChecked(), self.python_input.text().strip()
+        # Typing bursts become one write: 250 ms after the last edit, at most 1 s after the first
+        now = time.monotonic()
+        if not self._save_timer.isActive(): self._save_due = now + 1.0
+        self._save_timer.start(max(0, min(250, int((self._save_due - now) * 1000))))
+
+    def _commit_edits(self) -> None:
+        # Line edits save on editingFinished, which a tab click doesn't trigger; keep unsaved typing before switching bots
+        if not self._ready: return
+        if any(w.isModified() for w in (self.entry_input, self.flags_input, self.python_input)): self._save_bot()
+
+    def _flush_config(self) -> None: self._save_timer.stop(); save_config(self.bots)
 
     def _add_bot(self) -> None:
         name, ok = QInputDialog.getText(self, "New Bot", "Bot name:")
         if not ok or not name.strip(): return
         name = name.strip()
         if name in self.bots: QMessageBox.warning(self, "Duplicate", f"Bot '{name}' exists"); return
-        self.bots[name] = Bot(name=name); save_config(self.bots)
+        self.bots[name] = Bot(name=name); self._flush_config()
         self._create_views(name); self.bot_combo.setCurrentText(name); self._load_bot_ui(name); self._update_ui()
 
     def _del_bot(self) -> None:
@@ -174,25 +218,26 @@ class MainWindow(QMainWindow):
         if not name: return
         if self.proc_mgr.is_running(name): QMessageBox.warning(self, "Running", "Stop the script first"); return
         if QMessageBox.question(self, "Confirm", f"Delete '{name}'?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No) != QMessageBox.StandardButton.Yes: return
-        del self.bots[name]; save_config(self.bots)
-        if name in self.views: idx = self.tabs.indexOf(self.views[name]); (self.tabs.removeTab(idx) if idx >= 0 else None); del self.views[name]
-        self.buffers.pop(name, None); self._editors.pop(name, None)
+        del self.bots[name]; self._flush_config()
+        self.views.pop(name, None)
+        if (page := self._pages.pop(name, None)): idx = self.tabs.indexOf(page); (self.tabs.removeTab(idx) if idx >= 0 else None); self._view_names.pop(page, None)
+        (buf := self.buffers.pop(name, None)) and buf.close(); self._editors.pop(name, None)
         idx = self.bot_combo.findText(name); (self.bot_combo.removeItem(idx) if idx >= 0 else None); self._update_ui()
 
     def _browse_entry(self) -> None:
         path, _ = QFileDialog.getOpenFileName(self, "Select Script", "", "Python (*.py);;All (*)")
-        if path: self.entry_input.setText(path)
+        if path: self.entry_input.setText(path); self._save_bot()
 
     def _browse_python(self) -> None:
         filt = "Executable (*.exe);;All (*)" if sys.platform == "win32" else "All (*)"
         path, _ = QFileDialog.getOpenFileName(self, "Select Python", "", filt)
-        if path: self.python_input.setText(path)
+        if path: self.python_input.setText(path); self._save_bot()
 
     def _detect_python(self) -> None:
         entry = self.entry_input.text().strip()
         if not entry: QMessageBox.warning(self, "No entry", "Set an entry script first."); return
         vpy = Path(entry).resolve().parent / ".venv" / ("Scripts/python.exe" if sys.platform == "win32" else "bin/python")
-        if vpy.exists(): self.python_input.setText(str(vpy))
+        if vpy.exists(): self.python_input.setText(str(vpy)); self._save_bot()
         else: QMessageBox.information(self, "Not found", "No .venv found. Create venv first or select Python manually.")
 
     def _edit_entry(self) -> None:
@@ -215,16 +260,18 @@ class MainWindow(QMainWindow):
 
     def _on_tab_changed(self, index: int) -> None:
         if self._syncing or index < 0: return
-        self._syncing = True
-        widget = self.tabs.widget(index)
-        for name, view in self.views.items():
-            if view is widget: self.bot_combo.blockSignals(True); self.bot_combo.setCurrentText(name); self.bot_combo.blockSignals(False); self._load_bot_ui(name); break
+        self._syncing = True; self._commit_edits()
+        if (name := self._view_names.get(self.tabs.widget(index))):
+            with _blocked(self.bot_combo): self.bot_combo.setCurrentText(name)
+            self._load_bot_ui(name); self._ensure_view(name)
         self._syncing = False; self._update_ui()
 
     def _on_combo_changed(self, name: str) -> None:
         if self._syncing or not name: return
-        self._syncing = True; self._load_bot_ui(name)
-        if name in self.views: self.tabs.blockSignals(True); self.tabs.setCurrentWidget(self.views[name]); self.tabs.blockSignals(False)
+        self._syncing = True; self._commit_edits(); self._load_bot_ui(name)
+        if name in self._pages:
+            self._ensure_view(name)
+            with _blocked(self.tabs): self.tabs.setCurrentWidget(self._pages[name])
         self._syncing = False; self._update_ui()
 
     def _start_current(self) -> None:
@@ -260,8 +307,9 @@ class MainWindow(QMainWindow):
 
     def _on_output(self, name: str, text: str) -> None:
         if name not in self.buffers: return
-        disp, _ = self.buffers[name].append(text)
-        if disp and name in self.views: self.views[name].append(disp)
+        view = self.views.get(name)
+        disp, _ = self.buffers[name].append(text, view is not None and view.live)
+        if disp: view.append(disp)  # Only built while view is live
 
     def _on_finished(self, name: str, code: int, should_restart: bool) -> None:
         pid = self.proc_mgr.get_pid(name); (self.stats.clear(pid) if pid else None)
@@ -287,6 +335,9 @@ class MainWindow(QMainWindow):
         self.btn_del.setEnabled(bool(name) and not running); self.btn_start_all.setEnabled(n_running < n_total); self.btn_stop_all.setEnabled(n_running > 0)
 
     def closeEvent(self, event) -> None:
+        if not self._ready: event.accept(); return  # Closed before the deferred init: nothing built, loaded or running yet
+        self._commit_edits()
+        if self._save_timer.isActive(): self._flush_config()
         self.proc_mgr.stop_all()
         for e in self._editors.values(): e.close()
         if self._scratch: self._scratch.close()